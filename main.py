@@ -6,19 +6,126 @@ executes the analysis pipeline, and saves the final Excel report.
 """
 
 import logging
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 
 from src.config_manager import RiskConfig
 from src.data_loader import DataLoader
 from src.risk_engine import RiskEngine
 
+# Upper bound on concurrent downloads (I/O bound, so threads are sufficient)
+MAX_WORKERS = 16
+
 
 def setup_logging() -> None:
     """Configure console logging."""
     logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 
+def _analyze(
+    closes: List[Optional[pd.Series]],
+    engine: RiskEngine,
+    config: RiskConfig,
+) -> Tuple[List[str], Dict[str, Any], Dict[str, Any]]:
+    """
+    Run both analyses for every asset at once on a stacked price matrix.
+
+    Args:
+        closes: Close series per entry of config.assets (None if the download failed).
+
+    Returns:
+        (tickers_out, current_cols, drift_cols): The analysed tickers and, per
+        report, a dict mapping each field to an array aligned with tickers_out.
+    """
+    close_mat, lengths = DataLoader.stack_closes(closes)
+    rows = close_mat.shape[0]
+    if rows == 0:
+        return [], {}, {}
+
+    tickers = config.assets
+    annual_days = engine.annual_days
+    vol_mat = engine.calculate_volatility_batched(close_mat, annual_days)
+
+    # Handle case where current volatility is still NaN (brand new listing)
+    valid = ~np.isnan(vol_mat[-1])
+    for j in np.flatnonzero(~valid & (lengths > 0)):
+        logging.warning("  [WARN] Insufficient data for %s. Skipping.", tickers[j])
+
+    cols = np.flatnonzero(valid)
+    if cols.size == 0:
+        return [], {}, {}
+
+    close_mat = close_mat[:, cols]
+    vol_mat = vol_mat[:, cols]
+    lengths = lengths[cols]
+    annual_days = annual_days[cols]
+    pos = np.arange(cols.size)
+
+    # One scan of the price tail serves both analyses
+    cycle_highs, ath_rows = engine.price_extremes(close_mat)
+
+    # --- ANALYSIS A: Current Risk ---
+    current_prices = close_mat[-1]
+    # vol_mat is float32 for the kernels; report values stay float64
+    raw_vols = vol_mat[-1].astype(np.float64)
+    floors, effective_vols, drawdowns, safe_prices = engine.assess_current_risk(
+        close_mat, vol_mat, lengths, annual_days, cycle_highs
+    )
+
+    # --- ANALYSIS B: Leverage Drift ---
+    ath_prices = close_mat[ath_rows, pos]
+    ath_vols = vol_mat[ath_rows, pos].astype(np.float64)
+
+    # Calculate historical limits using ATH Vol
+    hist_limits = engine.compute_safe_prices_batched(ath_vols, ath_prices)
+    hk_prices = hist_limits.get("Half Kelly Price", np.full(cols.size, np.nan))
+
+    # --- Build report columns (one array per field, one slot per asset) ---
+    n = cols.size
+    tickers_out = [tickers[j] for j in cols]
+
+    current_cols: Dict[str, Any] = {
+        "Price": current_prices,
+        "Cycle High (1y)": cycle_highs,
+        "Drawdown": -drawdowns,
+        "Raw Vol": raw_vols,
+        "Dynamic Floor": floors,
+        "Floor Active?": np.where(effective_vols > raw_vols, "YES", "No"),
+    }
+    current_cols.update(safe_prices)
+
+    ath_dates = np.empty(n, dtype=object)
+    for i, j in enumerate(cols):
+        # Map the matrix row back onto this asset's own date index
+        ath_date = closes[j].index[ath_rows[i] - (rows - lengths[i])]
+        ath_dates[i] = str(ath_date.date())
+
+    # Survival Check (Half Kelly), resolved with masks rather than per-row NaN checks
+    has_hk = ~np.isnan(hk_prices)
+    liquidated = has_hk & (current_prices <= hk_prices)
+    margins = (current_prices - hk_prices) / current_prices
+
+    survival = np.full(n, "⚠️ Insufficient History", dtype=object)
+    survival[liquidated] = "❌ LIQUIDATED"
+    for i in np.flatnonzero(has_hk & ~liquidated):
+        survival[i] = f"SAFE (+{margins[i]:.1%})"
+
+    drift_cols: Dict[str, Any] = {
+        "ATH Date": ath_dates,
+        "ATH Price": ath_prices,
+        "ATH Vol": ath_vols,
+        "Current Price": current_prices,
+    }
+    for k, v in hist_limits.items():
+        drift_cols[f"ATH {k}"] = v
+    drift_cols["SURVIVAL CHECK"] = survival
+
+    return tickers_out, current_cols, drift_cols
+
+
 def main() -> None:
     """Execute the main analysis workflow."""
     setup_logging()
@@ -33,105 +140,37 @@ def main() -> None:
         logging.error("Initialization failed: %s", e)
         return
 
-    current_results = []
-    drift_results = []
-
-    # 2. Process Assets
-    for ticker in config.assets:
-        logging.info("Processing %s...", ticker)
-
-        data = loader.fetch_history(ticker)
-        if data is None:
-            continue
-
-        prices = data["Close"]
-        annual_days = engine.get_annual_days(ticker)
-        vol_series = engine.calculate_volatility(prices, annual_days)
-
-        # --- ANALYSIS A: Current Risk ---
-        current_price = float(prices.iloc[-1])
-        raw_vol = float(vol_series.iloc[-1])
-
-        # Handle case where current volatility is still NaN (brand new listing)
-        if pd.isna(raw_vol):
-            logging.warning("  [WARN] Insufficient data for %s. Skipping.", ticker)
-            continue
-
-        floor = engine.calculate_dynamic_floor(vol_series, annual_days)
-
-        effective_vol = max(raw_vol, floor)
-        is_floored = effective_vol > raw_vol
-
-        lookback = config.settings["lookback_days"]
-        cycle_high = float(prices.tail(lookback).max())
-        drawdown = (cycle_high - current_price) / cycle_high
-
-        row_curr = {
-            "Ticker": ticker,
-            "Price": current_price,
-            "Cycle High (1y)": cycle_high,
-            "Drawdown": -drawdown,
-            "Raw Vol": raw_vol,
-            "Dynamic Floor": floor,
-            "Floor Active?": "YES" if is_floored else "No",
-        }
-
-        # Add Safe Prices
-        safe_prices = engine.compute_safe_prices(effective_vol, cycle_high)
-        row_curr.update(safe_prices)
-        current_results.append(row_curr)
-
-        # --- ANALYSIS B: Leverage Drift ---
-        drift_days = config.settings["drift_lookback_days"]
-        window = prices.tail(drift_days)
-        ath_date = window.idxmax()
-        ath_price = float(window.max())
-
-        try:
-            ath_vol = float(vol_series.loc[ath_date])
-        except KeyError:
-            ath_vol = float(vol_series.asof(ath_date))
-
-        # Calculate historical limits using ATH Vol
-        hist_limits = engine.compute_safe_prices(ath_vol, ath_price)
-
-        row_drift = {
-            "Ticker": ticker,
-            "ATH Date": str(ath_date.date()),
-            "ATH Price": ath_price,
-            "ATH Vol": ath_vol,
-            "Current Price": current_price,
-        }
-
-        for k, v in hist_limits.items():
-            row_drift[f"ATH {k}"] = v
-
-        # Survival Check (Half Kelly)
-        hk_price = hist_limits.get("Half Kelly Price")
-
-        if hk_price is None or pd.isna(hk_price):
-            row_drift["SURVIVAL CHECK"] = "⚠️ Insufficient History"
-        elif current_price <= hk_price:
-            row_drift["SURVIVAL CHECK"] = "❌ LIQUIDATED"
-        else:
-            margin = (current_price - hk_price) / current_price
-            row_drift["SURVIVAL CHECK"] = f"SAFE (+{margin:.1%})"
-
-        drift_results.append(row_drift)
-
-    # 3. Generate Report
-    if not current_results:
+    # 2. Load Data (one batched download; stragglers fetched concurrently)
+    loader.prefetch(config.assets)
+
+    n_jobs = max(1, min(MAX_WORKERS, len(config.assets)))
+    frames = Parallel(n_jobs=n_jobs, backend="threading")(
+        delayed(loader.fetch_history)(t) for t in config.assets
+    )
+    closes = [None if f is None else f["Close"] for f in frames]
+
+    # 3. Process Assets
+    logging.info("Processing %d assets...", len(config.assets))
+    tickers_out, current_cols, drift_cols = _analyze(closes, engine, config)
+
+    # 4. Generate Report
+    if not tickers_out:
         logging.warning("No results generated.")
         return
 
     filename = "risk_analysis_report.xlsx"
 
-    # Transpose for readability (Ticker as columns)
-    df_curr = pd.DataFrame(current_results).set_index("Ticker").T
-    df_drift = pd.DataFrame(drift_results).set_index("Ticker").T
+    # Fields as rows, tickers as columns: built in that layout directly, since
+    # transposing a mixed-dtype frame costs a full object-dtype copy
+    columns = pd.Index(tickers_out, name="Ticker")
+    df_curr = pd.DataFrame.from_dict(current_cols, orient="index", columns=columns)
+    df_drift = pd.DataFrame.from_dict(drift_cols, orient="index", columns=columns)
 
     try:
-        with pd.ExcelWriter(filename, engine="openpyxl") as writer:
+        # xlsxwriter by default. Its constant_memory mode is unusable here:
+        # pandas writes column by column and earlier rows would be dropped.
+        excel_engine = config.settings.get("excel_engine", "xlsxwriter")
+        with pd.ExcelWriter(filename, engine=excel_engine) as writer:
             df_curr.to_excel(writer, sheet_name="Current Risk")
             df_drift.to_excel(writer, sheet_name="Leverage Drift")
         logging.info("\n[SUCCESS] Report saved to %s", filename)
@@ -0,0 +1,286 @@
+"""
+Numerical Kernels Module.
+
+JIT-compiled loops for the hot paths of the risk engine. Numba is optional:
+HAS_NUMBA is False when it cannot be imported and callers fall back to pandas.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels still define without numba."""
+
+        def wrap(func):
+            return func
+
+        return wrap
+
+    prange = range
+
+
+@njit(cache=True, fastmath=False)
+def _window_moments(x: np.ndarray, start: int, stop: int):
+    """Exact (count, mean, M2) of the non-NaN values in x[start:stop], two-pass."""
+    count = 0
+    total = 0.0
+    for k in range(start, stop):
+        v = x[k]
+        if not np.isnan(v):
+            count += 1
+            total += v
+
+    if count == 0:
+        return 0, 0.0, 0.0
+
+    mean = total / count
+    m2 = 0.0
+    for k in range(start, stop):
+        v = x[k]
+        if not np.isnan(v):
+            d = v - mean
+            m2 += d * d
+
+    return count, mean, m2
+
+
+@njit(cache=True, fastmath=False)
+def _rolling_std_into(
+    x: np.ndarray, window: int, min_periods: int, scale: float, out: np.ndarray
+) -> None:
+    """
+    Write rolling sample std (ddof=1) of x, times `scale`, into `out`.
+
+    Welford add/remove keeps each step O(1); the moments are recomputed
+    exactly every `window` steps so rounding drift cannot accumulate.
+    """
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(x.shape[0]):
+        if i >= window:
+            v = x[i - window]
+            if not np.isnan(v):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    d = v - mean
+                    mean -= d / count
+                    m2 -= d * (v - mean)
+
+        v = x[i]
+        if not np.isnan(v):
+            count += 1
+            d = v - mean
+            mean += d / count
+            m2 += d * (v - mean)
+
+        if (i + 1) % window == 0:
+            count, mean, m2 = _window_moments(x, max(0, i - window + 1), i + 1)
+
+        if count < min_periods or count < 2:
+            out[i] = np.nan
+        else:
+            out[i] = np.sqrt(max(m2, 0.0) / (count - 1)) * scale
+
+
+@njit(cache=True, fastmath=False)
+def rolling_std(x: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    """
+    Rolling sample standard deviation (ddof=1), matching pandas semantics.
+
+    NaNs are skipped and a result is only emitted once the window holds at
+    least `min_periods` valid observations. The window is updated
+    incrementally (O(1) per row) with a periodic exact recompute. float32
+    input is accepted; sums are always accumulated in float64 and the output
+    matches the input dtype.
+    """
+    out = np.empty_like(x)
+    _rolling_std_into(x, window, min_periods, 1.0, out)
+    return out
+
+
+@njit(parallel=True, cache=True, fastmath=False)
+def batched_log_rolling_std(
+    close: np.ndarray,
+    window: int,
+    min_periods: int,
+    annual_days: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """
+    Annualized rolling volatility of log returns for every column of `close`.
+
+    Fuses the log-return diff, the incremental rolling std and the
+    sqrt(annual_days[j]) scaling into one pass per column, with columns
+    processed in parallel. Log returns live in a float64 scratch buffer per
+    column; results are written into `out` (same shape as `close`, any float
+    dtype). Columns are traversed one at a time, so a Fortran-ordered `close`
+    is the fast layout.
+    """
+    rows = close.shape[0]
+    if rows == 0:
+        return
+
+    for j in prange(close.shape[1]):
+        log_ret = np.empty(rows)
+        log_ret[0] = np.nan
+        prev = np.log(close[0, j])
+        for i in range(1, rows):
+            cur = np.log(close[i, j])
+            log_ret[i] = cur - prev
+            prev = cur
+
+        _rolling_std_into(log_ret, window, min_periods, np.sqrt(annual_days[j]), out[:, j])
+
+
+@njit(cache=True, fastmath=False)
+def _select(buf: np.ndarray, k: int) -> float:
+    """
+    k-th smallest value of buf, partitioning buf in place (Wirth's algorithm).
+
+    Afterwards every element past index k is >= buf[k]. Hand-written rather
+    than np.partition, whose numba implementation is slow to compile.
+    """
+    lo = 0
+    hi = buf.shape[0] - 1
+    while lo < hi:
+        pivot = buf[k]
+        i = lo
+        j = hi
+        while i <= j:
+            while buf[i] < pivot:
+                i += 1
+            while pivot < buf[j]:
+                j -= 1
+            if i <= j:
+                tmp = buf[i]
+                buf[i] = buf[j]
+                buf[j] = tmp
+                i += 1
+                j -= 1
+        if j < k:
+            lo = i
+        if k < i:
+            hi = j
+    return buf[k]
+
+
+@njit(cache=True, fastmath=False)
+def _quantile(buf: np.ndarray, q: float) -> float:
+    """Linear-interpolated quantile of a NaN-free 1D buffer (reorders buf)."""
+    n = buf.shape[0]
+    h = q * (n - 1)
+    lo = int(np.floor(h))
+
+    a = _select(buf, lo)
+    if lo + 1 >= n:
+        return a
+    b = np.min(buf[lo + 1 :])
+    return a + (h - lo) * (b - a)
+
+
+@njit(parallel=True, cache=True, fastmath=False)
+def fused_price_extremes(close: np.ndarray, lookback: int, drift_days: int):
+    """
+    Cycle high and ATH row for every column in one scan of the longer tail.
+
+    A single pass over the last max(lookback, drift_days) rows keeps two
+    running accumulators: the max of the last `lookback` rows and the first
+    row holding the max of the last `drift_days` rows (NaNs skipped, ties
+    resolved to the earliest row, like np.nanargmax).
+
+    Returns:
+        (cycle_highs, ath_rows): ath_rows is -1 for an all-NaN window.
+    """
+    rows, m = close.shape
+    highs = np.empty(m)
+    ath_rows = np.empty(m, dtype=np.int64)
+
+    high_start = rows - lookback
+    ath_start = rows - drift_days
+
+    for j in prange(m):
+        high = np.nan
+        ath = np.nan
+        ath_row = -1
+        for i in range(max(0, min(high_start, ath_start)), rows):
+            v = close[i, j]
+            if np.isnan(v):
+                continue
+            if i >= high_start and (np.isnan(high) or v > high):
+                high = v
+            if i >= ath_start and (ath_row < 0 or v > ath):
+                ath = v
+                ath_row = i
+        highs[j] = high
+        ath_rows[j] = ath_row
+
+    return highs, ath_rows
+
+
+@njit(cache=True, fastmath=False)
+def fused_current_risk(
+    close: np.ndarray,
+    vol: np.ndarray,
+    lengths: np.ndarray,
+    floor_windows: np.ndarray,
+    highs: np.ndarray,
+    mults: np.ndarray,
+    pct: float,
+    cap: float,
+    fallback_floor: float,
+):
+    """
+    Current-risk metrics for every column in a single pass per column.
+
+    For each column j (right-aligned, NaN-padded at the top) computes the
+    dynamic floor (quantile of the last floor_windows[j] vols, or
+    fallback_floor when the history is shorter), the effective vol, the
+    drawdown from the cycle high highs[j], and the capped safe price for
+    every multiplier.
+
+    Returns:
+        (floors, effective_vols, drawdowns, safe_prices), the last of shape
+        (columns, len(mults)).
+    """
+    rows, m = close.shape
+    floors = np.empty(m)
+    effective = np.empty(m)
+    drawdowns = np.empty(m)
+    safe = np.empty((m, mults.shape[0]))
+
+    for j in range(m):
+        high = highs[j]
+        drawdowns[j] = (high - close[rows - 1, j]) / high
+
+        w = floor_windows[j]
+        if w <= 0 or lengths[j] < w:
+            floor = fallback_floor
+        else:
+            buf = np.empty(w)
+            n = 0
+            for i in range(rows - w, rows):
+                v = vol[i, j]
+                if not np.isnan(v):
+                    buf[n] = v
+                    n += 1
+            floor = _quantile(buf[:n], pct) if n > 0 else np.nan
+        floors[j] = floor
+
+        raw = vol[rows - 1, j]
+        eff = floor if floor > raw else raw
+        effective[j] = eff
+
+        for k in range(mults.shape[0]):
+            safe[j, k] = high * (1.0 - min(eff * mults[k], cap))
+
+    return floors, effective, drawdowns, safe
@@ -0,0 +1,105 @@
+"""
+Async Loader Module.
+
+Optional alternative to the yfinance batch download: fetches daily history
+for many tickers concurrently from Yahoo's chart endpoint on a single event
+loop. Requires aiohttp; HAS_AIOHTTP is False when it cannot be imported.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+try:
+    import aiohttp
+
+    HAS_AIOHTTP = True
+except ImportError:  # pragma: no cover - exercised only without aiohttp
+    aiohttp = None
+    HAS_AIOHTTP = False
+
+CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+MAX_CONNECTIONS = 16
+
+
+def parse_chart(payload: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    Convert a chart API response into a frame with a 'Close' column.
+
+    Mirrors yfinance's defaults: Close is the adjusted close when available,
+    dates are in the exchange's timezone (tz-naive), and empty rows are dropped.
+
+    Returns:
+        pd.DataFrame or None: Daily closes indexed by 'Date'.
+    """
+    result = (payload.get("chart") or {}).get("result") or []
+    if not result or not result[0].get("timestamp"):
+        return None
+
+    res = result[0]
+    indicators = res.get("indicators", {})
+    adjclose = (indicators.get("adjclose") or [{}])[0].get("adjclose")
+    close = adjclose if adjclose is not None else (indicators.get("quote") or [{}])[0].get("close")
+    if close is None:
+        return None
+
+    tz = res.get("meta", {}).get("exchangeTimezoneName") or "UTC"
+    dates = pd.to_datetime(res["timestamp"], unit="s", utc=True).tz_convert(tz)
+    index = pd.DatetimeIndex(dates.tz_localize(None).normalize(), name="Date")
+
+    frame = pd.DataFrame({"Close": np.asarray(close, dtype=np.float64)}, index=index)
+    return frame.dropna(how="all")
+
+
+async def fetch_one(session: Any, ticker: str, range_str: str) -> Optional[pd.DataFrame]:
+    """
+    Fetch one ticker's daily history.
+
+    Args:
+        session: An open aiohttp.ClientSession.
+        ticker: The asset symbol (e.g., 'BTC-USD').
+        range_str: Lookback in whole years, as produced for yfinance (e.g., '7y').
+    """
+    now = pd.Timestamp.now(tz="UTC")
+    params = {
+        "period1": int((now - pd.DateOffset(years=int(range_str.rstrip("y")))).timestamp()),
+        "period2": int(time.time()),
+        "interval": "1d",
+        "includeAdjustedClose": "true",
+    }
+
+    try:
+        async with session.get(CHART_URL.format(ticker=quote(ticker)), params=params) as resp:
+            resp.raise_for_status()
+            payload = await resp.json()
+        return parse_chart(payload)
+    except Exception as e:
+        logging.error("Error fetching data for %s: %s", ticker, e)
+        return None
+
+
+async def _fetch_all(tickers: List[str], range_str: str) -> Dict[str, Optional[pd.DataFrame]]:
+    """Run every fetch_one on a shared session and collect the results."""
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(
+        headers=HEADERS, connector=connector, timeout=timeout
+    ) as session:
+        frames = await asyncio.gather(*(fetch_one(session, t, range_str) for t in tickers))
+    return dict(zip(tickers, frames))
+
+
+def fetch_all(tickers: List[str], range_str: str) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Download all tickers concurrently, blocking until every request finishes.
+
+    Returns:
+        Dict mapping each ticker to its frame, or None if the fetch failed.
+    """
+    return asyncio.run(_fetch_all(tickers, range_str))
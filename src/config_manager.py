@@ -24,6 +24,11 @@ class RiskConfig:
         self.path = config_path
         self.data = self._load()
 
+        # Resolve sections once; the properties below are read in hot paths
+        self._assets: List[str] = list(self.data.get("assets", []))
+        self._settings: Dict[str, Any] = dict(self.data.get("settings", {}))
+        self._multipliers: Dict[str, float] = dict(self.data.get("risk_multipliers", {}))
+
     def _load(self) -> Dict[str, Any]:
         """Load JSON data from file with error handling."""
         try:
@@ -39,14 +44,14 @@ class RiskConfig:
     @property
     def assets(self) -> List[str]:
         """Return the list of asset tickers."""
-        return self.data.get("assets", [])
+        return self._assets
 
     @property
     def settings(self) -> Dict[str, Any]:
         """Return the general settings dictionary."""
-        return self.data.get("settings", {})
+        return self._settings
 
     @property
     def multipliers(self) -> Dict[str, float]:
         """Return the risk multiplier dictionary."""
-        return self.data.get("risk_multipliers", {})
+        return self._multipliers
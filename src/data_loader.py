@@ -5,11 +5,17 @@ Handles fetching historical market data from external APIs (Yahoo Finance).
 """
 
 import logging
-from typing import Any, Dict, Optional
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from src import async_loader
+from src.async_loader import HAS_AIOHTTP
+
 
 class DataLoader:
     """Fetches and preprocesses financial data."""
@@ -22,40 +28,182 @@ class DataLoader:
             settings: The 'settings' dictionary from RiskConfig.
         """
         self.settings = settings
+        self._cache: Dict[str, pd.DataFrame] = {}
+
+    def _period(self) -> str:
+        """Return the yfinance period string covering every lookback in use."""
+        drift_days = self.settings.get("drift_lookback_days", 1825)
+        floor_cfg = self.settings.get("dynamic_floor", {})
+        floor_years = floor_cfg.get("lookback_years", 5)
+
+        # Calculate max lookback needed (max of drift or dynamic floor)
+        floor_days = floor_years * 365
+        max_days = max(drift_days, floor_days) + 365  # Add buffer
+
+        # Convert to year string for yfinance (e.g., "7y")
+        return f"{int(max_days / 365) + 1}y"
+
+    def _disk_path(self, ticker: str) -> Optional[Path]:
+        """Return today's cache file for a ticker, or None if disk caching is off."""
+        cache_dir = self.settings.get("cache_dir")
+        if not cache_dir:
+            return None
+        return Path(cache_dir) / f"{ticker}_{self._period()}_{date.today()}.parquet"
+
+    def _read_disk(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Load a ticker from today's disk cache, if present."""
+        path = self._disk_path(ticker)
+        if path is None or not path.exists():
+            return None
+
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            logging.warning("Ignoring unreadable cache file %s: %s", path, e)
+            return None
+
+    def _store(self, ticker: str, data: pd.DataFrame) -> None:
+        """Keep downloaded data in memory and, if enabled, in the disk cache."""
+        self._cache[ticker] = data
+
+        path = self._disk_path(ticker)
+        if path is None:
+            return
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # The date in the filename is the invalidation key; drop older days
+            for stale in path.parent.glob(f"{ticker}_*.parquet"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+            data.to_parquet(path)
+        except Exception as e:
+            logging.warning("Could not write cache file %s: %s", path, e)
+
+    def prefetch(self, tickers: List[str]) -> None:
+        """
+        Download every ticker in a single batched request and cache the results.
+
+        Tickers already in today's disk cache are not downloaded again. With
+        settings.use_async_loader the concurrent chart-API loader is used
+        instead of yfinance. Tickers missing from the response are simply not
+        cached, so fetch_history() falls back to an individual download.
+
+        Args:
+            tickers: The asset symbols to download.
+        """
+        missing = []
+        for ticker in tickers:
+            cached = self._read_disk(ticker)
+            if cached is None:
+                missing.append(ticker)
+            else:
+                self._cache[ticker] = cached
+
+        if not missing:
+            return
+
+        if self.settings.get("use_async_loader"):
+            if HAS_AIOHTTP:
+                try:
+                    frames = async_loader.fetch_all(missing, self._period())
+                    for ticker, frame in frames.items():
+                        if frame is not None and not frame.empty:
+                            self._store(ticker, frame)
+                    return
+                except Exception as e:
+                    logging.error("Error during async download: %s", e)
+            else:
+                logging.warning("use_async_loader is set but aiohttp is missing; using yfinance.")
+
+        try:
+            data = yf.download(
+                missing,
+                period=self._period(),
+                interval="1d",
+                progress=False,
+                group_by="ticker",
+                threads=True,
+            )
+        except Exception as e:
+            logging.error("Error during batch download: %s", e)
+            return
+
+        # group_by="ticker" always yields (ticker, field) columns
+        if data is None or data.empty:
+            return
+
+        available = set(data.columns.get_level_values(0))
+        for ticker in missing:
+            if ticker not in available:
+                continue
+
+            # The batch is aligned on a shared calendar (crypto trades on weekends,
+            # stocks do not), so drop the padding rows for this ticker.
+            frame = data[ticker].dropna(how="all")
+            if not frame.empty:
+                self._store(ticker, frame)
 
     def fetch_history(self, ticker: str) -> Optional[pd.DataFrame]:
         """
         Fetches historical data sufficient for both dynamic floors and drift.
 
+        Serves from the prefetch/disk cache when available, otherwise
+        downloads the ticker on its own.
+
         Args:
             ticker: The asset symbol (e.g., 'BTC-USD').
 
         Returns:
             pd.DataFrame or None: Historical price data.
         """
-        drift_days = self.settings.get("drift_lookback_days", 1825)
-        floor_cfg = self.settings.get("dynamic_floor", {})
-        floor_years = floor_cfg.get("lookback_years", 5)
-
-        # Calculate max lookback needed (max of drift or dynamic floor)
-        floor_days = floor_years * 365
-        max_days = max(drift_days, floor_days) + 365  # Add buffer
-
-        # Convert to year string for yfinance (e.g., "7y")
-        years_str = f"{int(max_days / 365) + 1}y"
+        cached = self._cache.get(ticker)
+        if cached is None:
+            cached = self._read_disk(ticker)
+        if cached is not None:
+            self._cache[ticker] = cached
+            return cached
 
         try:
-            data = yf.download(ticker, period=years_str, interval="1d", progress=False)
+            data = yf.download(ticker, period=self._period(), interval="1d", progress=False)
 
             if data.empty:
                 return None
 
-            # Flatten MultiIndex columns if present (compatibility fix)
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.get_level_values(0)
+            # Flatten (field, ticker) columns; a no-op on already-flat columns
+            data.columns = data.columns.get_level_values(0)
 
+            self._store(ticker, data)
             return data
 
         except Exception as e:
             logging.error("Error fetching data for %s: %s", ticker, e)
             return None
+
+    @staticmethod
+    def stack_closes(closes: List[Optional[pd.Series]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stack close series into a single (rows, assets) matrix.
+
+        Each series is right-aligned on its own most recent observation rather
+        than reindexed onto a shared calendar, so `mat[-n:, j]` is exactly the
+        last n rows of asset j (stocks and crypto keep their own trading days).
+        Shorter histories are padded with NaN at the top; None becomes an
+        all-NaN column.
+
+        Args:
+            closes: One close series (or None) per asset.
+
+        Returns:
+            (close_mat, lengths): The padded matrix and each column's row count.
+        """
+        lengths = np.array([0 if c is None else len(c) for c in closes], dtype=np.int64)
+        rows = int(lengths.max()) if lengths.size else 0
+
+        # Column-major: each asset's history is contiguous for per-column kernels
+        close_mat = np.full((rows, len(closes)), np.nan, order="F")
+        for j, c in enumerate(closes):
+            if lengths[j]:
+                close_mat[rows - lengths[j] :, j] = c.to_numpy(dtype=np.float64)
+
+        return close_mat, lengths
@@ -5,11 +5,19 @@ Contains the core mathematical logic for volatility calculation,
 dynamic floor determination, and safe price projection.
 """
 
-from typing import Dict
+import math
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from src._kernels import (
+    HAS_NUMBA,
+    batched_log_rolling_std,
+    fused_current_risk,
+    fused_price_extremes,
+    rolling_std,
+)
 from src.config_manager import RiskConfig
 
 
@@ -21,6 +29,16 @@ class RiskEngine:
         self.config = config
         self.settings = config.settings
 
+        # Multipliers as parallel name/value arrays for vectorized pricing
+        self._mult_names = list(config.multipliers.keys())
+        self._mult_arr = np.asarray(list(config.multipliers.values()), dtype=np.float64)
+        self._max_cap = self.settings.get("max_crash_cap", 0.85)
+
+        # Trading days per configured asset, aligned with config.assets
+        self.annual_days = np.array(
+            [self.get_annual_days(t) for t in config.assets], dtype=np.int32
+        )
+
     def get_annual_days(self, ticker: str) -> int:
         """Determine trading days based on asset class."""
         if "-" in ticker:
@@ -35,11 +53,52 @@ class RiskEngine:
         that haven't been trading for the full window (30 days) yet.
         """
         window = self.settings.get("volatility_window", 30)
-        log_ret = np.log(prices / prices.shift(1))
+
+        # Single pass over log prices; the first return has no predecessor
+        logp = np.log(prices.to_numpy(dtype=np.float64))
+        log_ret = np.empty_like(logp)
+        log_ret[:1] = np.nan
+        log_ret[1:] = np.diff(logp)
 
         # Fix: Allow calculation if we have at least 5 days of data
-        rolling_vol = log_ret.rolling(window=window, min_periods=5).std() * np.sqrt(annual_days)
-        return rolling_vol
+        if HAS_NUMBA:
+            rolling = rolling_std(log_ret, window, 5)
+        else:
+            rolling = pd.Series(log_ret).rolling(window=window, min_periods=5).std().to_numpy()
+
+        return pd.Series(rolling * np.sqrt(annual_days), index=prices.index)
+
+    def calculate_volatility_batched(
+        self, close_mat: np.ndarray, annual_days: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate annualized rolling volatility for every column of a price matrix.
+
+        The output is float32, which halves the memory traffic of the quantile
+        stages; log returns and window sums are computed in float64. With numba,
+        the whole computation runs as one fused kernel parallelized over columns.
+
+        Args:
+            close_mat: (rows, assets) closes, one asset per column.
+            annual_days: Trading days per year for each column.
+
+        Returns:
+            np.ndarray: float32 volatility matrix with the same shape as close_mat.
+        """
+        window = self.settings.get("volatility_window", 30)
+
+        if HAS_NUMBA:
+            vol = np.empty(close_mat.shape, dtype=np.float32, order="F")
+            annual = np.asarray(annual_days, dtype=np.float64)
+            batched_log_rolling_std(close_mat, window, 5, annual, vol)
+            return vol
+
+        log_ret = np.empty(close_mat.shape, dtype=np.float32)
+        log_ret[:1] = np.nan
+        log_ret[1:] = np.diff(np.log(close_mat), axis=0)
+
+        rolling = pd.DataFrame(log_ret).rolling(window=window, min_periods=5).std()
+        return rolling.to_numpy(dtype=np.float32) * np.sqrt(annual_days).astype(np.float32)
 
     def calculate_dynamic_floor(self, rolling_vol: pd.Series, annual_days: int) -> float:
         """Calculate the 25th percentile floor from historical volatility."""
@@ -49,28 +108,152 @@ class RiskEngine:
 
         window_size = int(years * annual_days)
 
-        if len(rolling_vol) < window_size:
+        vals = rolling_vol.to_numpy()
+        if vals.size < window_size:
             return 0.50  # Safe fallback if insufficient history
 
-        history = rolling_vol.tail(window_size)
-        return float(history.quantile(percentile))
+        # Same result as Series.quantile (linear interpolation, NaNs skipped),
+        # computed on a view of the tail instead of a .tail() copy
+        return float(np.nanquantile(vals[-window_size:], percentile))
+
+    def calculate_dynamic_floors(
+        self, vol_mat: np.ndarray, lengths: np.ndarray, annual_days: np.ndarray
+    ) -> np.ndarray:
+        """
+        Batched calculate_dynamic_floor over the columns of a volatility matrix.
+
+        Columns sharing a lookback window are resolved together with a single
+        np.partition (linear-time selection) instead of a full sort. Windows
+        containing NaNs fall back to np.nanquantile for that column.
+
+        Args:
+            vol_mat: (rows, assets) volatility, each column right-aligned.
+            lengths: Number of observed rows for each column.
+            annual_days: Trading days per year for each column.
+        """
+        cfg = self.settings.get("dynamic_floor", {})
+        years = cfg.get("lookback_years", 5)
+        percentile = cfg.get("percentile", 0.25)
+
+        rows = vol_mat.shape[0]
+        floors = np.full(vol_mat.shape[1], 0.50)  # Safe fallback if insufficient history
+        window_sizes = (years * np.asarray(annual_days)).astype(np.int64)
+
+        for window_size in np.unique(window_sizes):
+            cols = np.flatnonzero((window_sizes == window_size) & (lengths >= window_size))
+            if window_size <= 0 or cols.size == 0:
+                continue
 
-    def compute_safe_prices(self, vol: float, cycle_high: float) -> Dict[str, float]:
+            tail = vol_mat[rows - window_size :, cols]
+            clean = ~np.isnan(tail).any(axis=0)
+
+            if clean.any():
+                floors[cols[clean]] = self._partition_quantile(tail[:, clean], percentile)
+            for j in cols[~clean]:
+                floors[j] = np.nanquantile(vol_mat[rows - window_size :, j], percentile)
+
+        return floors
+
+    @staticmethod
+    def _partition_quantile(block: np.ndarray, q: float) -> np.ndarray:
+        """Column-wise linear-interpolated quantile of a NaN-free 2D block."""
+        h = q * (block.shape[0] - 1)
+        lo = int(np.floor(h))
+        hi = min(lo + 1, block.shape[0] - 1)
+
+        part = np.partition(block, [lo, hi], axis=0)
+        return part[lo] + (h - lo) * (part[hi] - part[lo])
+
+    def compute_safe_prices(
+        self, vol: Optional[float], cycle_high: float
+    ) -> Dict[str, Optional[float]]:
         """Generate the dictionary of safe prices based on multipliers."""
-        res = {}
+        # Guard clause: If volatility is missing or NaN, return None for prices
+        if vol is None or math.isnan(vol):
+            return dict.fromkeys((f"{name} Price" for name in self._mult_names), None)
+
+        crashes = np.minimum(vol * self._mult_arr, self._max_cap)
+        prices = cycle_high * (1.0 - crashes)
+        return dict(zip((f"{name} Price" for name in self._mult_names), prices.tolist()))
+
+    def compute_safe_prices_batched(
+        self, vols: np.ndarray, cycle_highs: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Batched compute_safe_prices: one array of prices per multiplier.
+
+        NaN volatility propagates to NaN prices.
+        """
+        crashes = np.minimum(np.outer(vols, self._mult_arr), self._max_cap)
+        prices = cycle_highs[:, None] * (1.0 - crashes)
+        return {f"{name} Price": prices[:, i] for i, name in enumerate(self._mult_names)}
+
+    def price_extremes(self, close_mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cycle high (last lookback_days rows) and ATH row (last drift_lookback_days).
 
-        # Guard clause: If volatility is NaN, return None for prices
-        if pd.isna(vol):
-            for name in self.config.multipliers.keys():
-                res[f"{name} Price"] = None
-            return res
+        Both reductions share one tail: with numba they are a single fused
+        scan per column, otherwise two NumPy reductions over views of it.
 
-        max_cap = self.settings.get("max_crash_cap", 0.85)
+        Returns:
+            (cycle_highs, ath_rows): ath_rows index rows of close_mat.
+        """
+        lookback = self.settings.get("lookback_days", 365)
+        drift_days = self.settings.get("drift_lookback_days", 1825)
+
+        if HAS_NUMBA:
+            return fused_price_extremes(close_mat, lookback, drift_days)
+
+        rows = close_mat.shape[0]
+        tail = close_mat[-max(lookback, drift_days) :]
+        cycle_highs = np.nanmax(tail[-lookback:], axis=0)
+        ath_rows = max(0, rows - drift_days) + np.nanargmax(tail[-drift_days:], axis=0)
+        return cycle_highs, ath_rows
+
+    def assess_current_risk(
+        self,
+        close_mat: np.ndarray,
+        vol_mat: np.ndarray,
+        lengths: np.ndarray,
+        annual_days: np.ndarray,
+        cycle_highs: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Batched current-risk analysis over right-aligned price/vol matrices.
+
+        With numba this is one fused kernel (a single pass per column);
+        otherwise it composes the batched floor and safe-price methods.
 
-        for name, mult in self.config.multipliers.items():
-            crash = vol * mult
-            if crash > max_cap:
-                crash = max_cap
-            res[f"{name} Price"] = cycle_high * (1 - crash)
+        Args:
+            cycle_highs: Per-column cycle highs, as returned by price_extremes().
+
+        Returns:
+            (floors, effective_vols, drawdowns, safe_prices): drawdowns are
+            positive fractions below the cycle high and safe_prices maps each
+            "<name> Price" label to an array.
+        """
+        if not HAS_NUMBA:
+            floors = self.calculate_dynamic_floors(vol_mat, lengths, annual_days)
+            effective_vols = np.fmax(vol_mat[-1], floors)
+            drawdowns = (cycle_highs - close_mat[-1]) / cycle_highs
+            safe_prices = self.compute_safe_prices_batched(effective_vols, cycle_highs)
+            return floors, effective_vols, drawdowns, safe_prices
+
+        cfg = self.settings.get("dynamic_floor", {})
+        years = cfg.get("lookback_years", 5)
+        percentile = cfg.get("percentile", 0.25)
+        floor_windows = (years * np.asarray(annual_days)).astype(np.int64)
 
-        return res
+        floors, effective_vols, drawdowns, safe = fused_current_risk(
+            close_mat,
+            vol_mat,
+            np.asarray(lengths, dtype=np.int64),
+            floor_windows,
+            np.asarray(cycle_highs, dtype=np.float64),
+            self._mult_arr,
+            percentile,
+            self._max_cap,
+            0.50,  # Safe fallback if insufficient history
+        )
+        safe_prices = {f"{name} Price": safe[:, i] for i, name in enumerate(self._mult_names)}
+        return floors, effective_vols, drawdowns, safe_prices
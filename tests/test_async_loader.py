@@ -0,0 +1,51 @@
+"""
+Tests for the async chart-API loader.
+Covers response parsing; network calls are not exercised.
+"""
+
+import numpy as np
+
+from src.async_loader import parse_chart
+
+
+def _payload(close, adjclose=None):
+    indicators = {"quote": [{"close": close}]}
+    if adjclose is not None:
+        indicators["adjclose"] = [{"adjclose": adjclose}]
+    return {
+        "chart": {
+            "result": [
+                {
+                    "meta": {"exchangeTimezoneName": "America/New_York"},
+                    # 2024-01-02 / 01-03 / 01-04 at 14:30 UTC (09:30 New York)
+                    "timestamp": [1704205800, 1704292200, 1704378600],
+                    "indicators": indicators,
+                }
+            ]
+        }
+    }
+
+
+def test_parse_chart_prefers_adjusted_close():
+    """Close should be the adjusted close, indexed by exchange-local dates."""
+    df = parse_chart(_payload([10.0, 11.0, 12.0], adjclose=[9.0, 10.0, 11.0]))
+
+    assert list(df.columns) == ["Close"]
+    assert list(df["Close"]) == [9.0, 10.0, 11.0]
+    assert df.index.name == "Date"
+    assert df.index.tz is None
+    assert [str(d.date()) for d in df.index] == ["2024-01-02", "2024-01-03", "2024-01-04"]
+
+
+def test_parse_chart_drops_missing_rows():
+    """Null closes (halted days) are dropped, as yfinance does."""
+    df = parse_chart(_payload([10.0, None, 12.0]))
+
+    assert len(df) == 2
+    assert not np.isnan(df["Close"]).any()
+
+
+def test_parse_chart_error_payload():
+    """An error/empty response yields None instead of raising."""
+    assert parse_chart({"chart": {"result": None, "error": {"code": "Not Found"}}}) is None
+    assert parse_chart({}) is None
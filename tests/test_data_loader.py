@@ -2,6 +2,7 @@
 Tests for DataLoader.
 """
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -52,3 +53,118 @@ def test_fetch_history_flatten_multiindex(mocker, mock_settings):
     assert isinstance(df.columns, pd.Index)
     assert not isinstance(df.columns, pd.MultiIndex)
     assert "Close" in df.columns
+
+
+def test_prefetch_serves_from_cache(mocker, mock_settings):
+    """Test that a batched prefetch is split per ticker and reused."""
+    loader = DataLoader(mock_settings)
+
+    idx = pd.date_range("2024-01-01", periods=3)
+    mock_data = pd.concat(
+        {
+            "BTC-USD": pd.DataFrame({"Close": [100.0, 101.0, 102.0]}, index=idx),
+            "NVDA": pd.DataFrame({"Close": [50.0, None, 52.0]}, index=idx),
+        },
+        axis=1,
+    )
+    download = mocker.patch("yfinance.download", return_value=mock_data)
+
+    loader.prefetch(["BTC-USD", "NVDA"])
+    btc = loader.fetch_history("BTC-USD")
+    nvda = loader.fetch_history("NVDA")
+
+    assert download.call_count == 1
+    assert list(btc.columns) == ["Close"]
+    assert len(btc) == 3
+    # Calendar padding rows (e.g. weekends for stocks) are dropped
+    assert len(nvda) == 2
+
+
+def test_prefetch_missing_ticker_falls_back(mocker, mock_settings):
+    """Test that tickers absent from the batch are downloaded individually."""
+    loader = DataLoader(mock_settings)
+
+    mocker.patch("yfinance.download", return_value=pd.DataFrame())
+    loader.prefetch(["BTC-USD"])
+
+    single = pd.DataFrame({"Close": [100, 101, 102]})
+    download = mocker.patch("yfinance.download", return_value=single)
+
+    df = loader.fetch_history("BTC-USD")
+    assert download.call_count == 1
+    assert len(df) == 3
+
+
+def test_stack_closes_right_aligns():
+    """Histories of different lengths are aligned on their latest observation."""
+    long = pd.Series([1.0, 2.0, 3.0, 4.0])
+    short = pd.Series([10.0, 20.0])
+
+    close_mat, lengths = DataLoader.stack_closes([long, None, short])
+
+    assert close_mat.shape == (4, 3)
+    assert list(lengths) == [4, 0, 2]
+    assert list(close_mat[-2:, 2]) == [10.0, 20.0]
+    assert np.isnan(close_mat[:2, 2]).all()
+    assert np.isnan(close_mat[:, 1]).all()
+
+
+def test_disk_cache_reused_across_loaders(mocker, tmp_path):
+    """Test that a second run on the same day reads from disk, not the network."""
+    settings = {"drift_lookback_days": 100, "cache_dir": str(tmp_path)}
+    idx = pd.date_range("2024-01-01", periods=3, name="Date")
+    mock_data = pd.DataFrame({"Close": [100.0, 101.0, 102.0]}, index=idx)
+    download = mocker.patch("yfinance.download", return_value=mock_data)
+
+    DataLoader(settings).fetch_history("BTC-USD")
+    df = DataLoader(settings).fetch_history("BTC-USD")
+
+    assert download.call_count == 1
+    pd.testing.assert_frame_equal(df, mock_data, check_freq=False)
+
+
+def test_disk_cache_replaces_stale_files(mocker, tmp_path):
+    """Test that files from previous days are removed when today's is written."""
+    settings = {"drift_lookback_days": 100, "cache_dir": str(tmp_path)}
+    stale = tmp_path / "BTC-USD_3y_2000-01-01.parquet"
+    stale.write_bytes(b"")
+    mocker.patch("yfinance.download", return_value=pd.DataFrame({"Close": [1.0, 2.0]}))
+
+    DataLoader(settings).fetch_history("BTC-USD")
+
+    assert not stale.exists()
+    assert len(list(tmp_path.glob("BTC-USD_*.parquet"))) == 1
+
+
+def test_prefetch_uses_async_loader_when_enabled(mocker, mock_settings):
+    """Test that the async chart loader replaces the yfinance batch when toggled."""
+    loader = DataLoader({**mock_settings, "use_async_loader": True})
+    mocker.patch("src.data_loader.HAS_AIOHTTP", True)
+
+    frame = pd.DataFrame({"Close": [100.0, 101.0]})
+    fetch_all = mocker.patch(
+        "src.async_loader.fetch_all", return_value={"BTC-USD": frame, "BAD": None}
+    )
+    download = mocker.patch("yfinance.download")
+
+    loader.prefetch(["BTC-USD", "BAD"])
+
+    fetch_all.assert_called_once()
+    download.assert_not_called()
+    assert loader.fetch_history("BTC-USD") is frame
+
+
+def test_prefetch_async_failure_falls_back_to_yfinance(mocker, mock_settings):
+    """Test that an async loader crash is logged and the yfinance batch runs instead."""
+    loader = DataLoader({**mock_settings, "use_async_loader": True})
+    mocker.patch("src.data_loader.HAS_AIOHTTP", True)
+    mocker.patch("src.async_loader.fetch_all", side_effect=RuntimeError("loop is running"))
+
+    idx = pd.date_range("2024-01-01", periods=2)
+    mock_data = pd.concat({"BTC-USD": pd.DataFrame({"Close": [1.0, 2.0]}, index=idx)}, axis=1)
+    download = mocker.patch("yfinance.download", return_value=mock_data)
+
+    loader.prefetch(["BTC-USD"])
+
+    download.assert_called_once()
+    assert len(loader.fetch_history("BTC-USD")) == 2
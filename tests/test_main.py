@@ -0,0 +1,123 @@
+"""
+Tests for the main analysis pipeline (_analyze).
+Checks the batched report columns against per-series pandas calculations.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import _analyze
+from src.config_manager import RiskConfig
+from src.risk_engine import RiskEngine
+
+
+@pytest.fixture
+def mock_config(mocker):
+    """Stock, crypto, a second crypto peaking on day one, a new listing and a dead ticker."""
+    config = mocker.Mock(spec=RiskConfig)
+    config.assets = ["NVDA", "BTC-USD", "SOL-USD", "BMNR", "DEAD"]
+    config.settings = {
+        "lookback_days": 365,
+        "drift_lookback_days": 1825,
+        "volatility_window": 30,
+        "crypto_trading_days": 365,
+        "stock_trading_days": 252,
+        "max_crash_cap": 0.85,
+        "dynamic_floor": {"lookback_years": 5, "percentile": 0.25},
+    }
+    config.multipliers = {"Full Kelly": 0.8, "Half Kelly": 1.5}
+    return config
+
+
+@pytest.fixture
+def closes():
+    """Close series per asset, each on its own calendar."""
+    rng = np.random.default_rng(11)
+
+    # Stock: calm rally to a peak, then a slow bleed to 40% of it -> LIQUIDATED.
+    # Too short for the 5y floor window, so the 0.50 fallback floor is active.
+    up = np.linspace(0, np.log(3), 200) + rng.normal(0, 0.002, 200)
+    down = up[-1] + np.linspace(0, np.log(0.4), 100)[1:] + rng.normal(0, 0.002, 99)
+    nvda = pd.Series(
+        100 * np.exp(np.concatenate([up, down])),
+        index=pd.bdate_range("2023-01-02", periods=299),
+    )
+
+    # Crypto: volatile uptrend ending near its high -> SAFE, vol above the floor
+    btc = pd.Series(
+        20000 * np.exp(np.cumsum(rng.normal(0.004, 0.05, 500))),
+        index=pd.date_range("2022-06-01", periods=500),
+    )
+
+    # Crypto peaking on day one, before any volatility exists -> no ATH vol
+    sol = pd.Series(
+        np.linspace(200, 50, 60) * np.exp(rng.normal(0, 0.01, 60)),
+        index=pd.date_range("2023-09-01", periods=60),
+    )
+    sol.iloc[0] = 500.0
+
+    # New listing: too short for even the 5-day minimum volatility window
+    bmnr = pd.Series([10.0, 10.5, 11.0], index=pd.bdate_range("2023-10-02", periods=3))
+
+    return [nvda, btc, sol, bmnr, None]
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_analyze_matches_per_series(mock_config, closes, mocker, caplog, use_numba):
+    """Batched report columns agree with a per-series walk of each asset."""
+    if not use_numba:
+        mocker.patch("src.risk_engine.HAS_NUMBA", False)
+    engine = RiskEngine(mock_config)
+
+    with caplog.at_level(logging.WARNING):
+        tickers_out, current_cols, drift_cols = _analyze(closes, engine, mock_config)
+
+    # Short listing is skipped with a warning; the failed download silently
+    assert tickers_out == ["NVDA", "BTC-USD", "SOL-USD"]
+    assert "Insufficient data for BMNR" in caplog.text
+    assert "DEAD" not in caplog.text
+
+    # The float32 volatility matrix must not leak into the report
+    for cols in (current_cols, drift_cols):
+        for field, values in cols.items():
+            if values.dtype.kind == "f":
+                assert values.dtype == np.float64, field
+
+    for i, ticker in enumerate(tickers_out):
+        close = closes[i]
+        annual = engine.get_annual_days(ticker)
+        vol = engine.calculate_volatility(close, annual)
+
+        ath_date = close.tail(1825).idxmax()
+        assert drift_cols["ATH Date"][i] == str(ath_date.date())
+        assert drift_cols["ATH Price"][i] == close[ath_date]
+        np.testing.assert_allclose(drift_cols["ATH Vol"][i], vol[ath_date], rtol=1e-5)
+        np.testing.assert_allclose(current_cols["Raw Vol"][i], vol.iloc[-1], rtol=1e-5)
+        np.testing.assert_allclose(
+            current_cols["Cycle High (1y)"][i], close.tail(365).max(), rtol=1e-12
+        )
+        floor = engine.calculate_dynamic_floor(vol, annual)
+        np.testing.assert_allclose(current_cols["Dynamic Floor"][i], floor, rtol=1e-5)
+
+    assert list(current_cols["Floor Active?"]) == ["YES", "No", "YES"]
+    assert drift_cols["SURVIVAL CHECK"][0] == "❌ LIQUIDATED"
+    assert drift_cols["SURVIVAL CHECK"][2] == "⚠️ Insufficient History"
+
+    btc = closes[1]
+    btc_vol = engine.calculate_volatility(btc, 365)
+    ath_date = btc.idxmax()
+    hk_price = btc[ath_date] * (1 - min(btc_vol[ath_date] * 1.5, 0.85))
+    margin = (btc.iloc[-1] - hk_price) / btc.iloc[-1]
+    assert drift_cols["SURVIVAL CHECK"][1] == f"SAFE (+{margin:.1%})"
+
+
+def test_analyze_no_usable_assets(mock_config):
+    """All-missing input yields empty results instead of raising."""
+    engine = RiskEngine(mock_config)
+    short = pd.Series([1.0, 2.0], index=pd.bdate_range("2024-01-01", periods=2))
+
+    assert _analyze([None] * 5, engine, mock_config) == ([], {}, {})
+    assert _analyze([short, None, None, None, None], engine, mock_config) == ([], {}, {})
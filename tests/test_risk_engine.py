@@ -15,6 +15,7 @@ from src.risk_engine import RiskEngine
 def mock_config(mocker):
     """Mock configuration with standard settings."""
     config = mocker.Mock(spec=RiskConfig)
+    config.assets = ["BTC-USD", "NVDA"]
     config.settings = {
         "volatility_window": 30,
         "crypto_trading_days": 365,
@@ -77,6 +78,11 @@ def test_compute_safe_prices_nan_volatility(mock_config):
 
     assert result["Half Kelly Price"] is None
 
+    # Missing volatility is treated the same way
+    result = engine.compute_safe_prices(None, cycle_high=100.0)
+
+    assert result == {"Half Kelly Price": None}
+
 
 def test_compute_safe_prices_hard_cap(mock_config):
     """Ensure crashes are capped at 85% (Max Crash Cap)."""
@@ -89,3 +95,143 @@ def test_compute_safe_prices_hard_cap(mock_config):
     # Price = 100 * (1 - 0.85) = 15.0
     expected_price = 100.0 * (1 - 0.85)
     assert result["Half Kelly Price"] == pytest.approx(expected_price)
+
+
+def test_volatility_pandas_fallback_matches_kernel(mock_config, mocker):
+    """The pandas fallback (no numba) must agree with the JIT path."""
+    engine = RiskEngine(mock_config)
+    rng = np.random.default_rng(0)
+    prices = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 200))))
+
+    fast = engine.calculate_volatility(prices, 365)
+    mocker.patch("src.risk_engine.HAS_NUMBA", False)
+    slow = engine.calculate_volatility(prices, 365)
+
+    np.testing.assert_allclose(fast.to_numpy(), slow.to_numpy(), rtol=1e-10, equal_nan=True)
+
+
+def test_volatility_batched_matches_single(mock_config):
+    """Each column of the batched result should equal the per-series calculation."""
+    engine = RiskEngine(mock_config)
+    rng = np.random.default_rng(1)
+    a = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 120))))
+    b = pd.Series(50 * np.exp(np.cumsum(rng.normal(0, 0.04, 120))))
+    close_mat = np.column_stack([a.to_numpy(), b.to_numpy()])
+
+    vol_mat = engine.calculate_volatility_batched(close_mat, np.array([365, 252]))
+
+    # The batched path runs in float32, so compare at single precision
+    assert vol_mat.dtype == np.float32
+    np.testing.assert_allclose(
+        vol_mat[:, 0], engine.calculate_volatility(a, 365).to_numpy(), rtol=1e-5, equal_nan=True
+    )
+    np.testing.assert_allclose(
+        vol_mat[:, 1], engine.calculate_volatility(b, 252).to_numpy(), rtol=1e-5, equal_nan=True
+    )
+
+
+def test_dynamic_floors_batched(mock_config):
+    """Batched floors honour per-column history length and trading days."""
+    engine = RiskEngine(mock_config)
+    rng = np.random.default_rng(2)
+    vol_mat = rng.uniform(0.2, 1.0, size=(2000, 2))
+
+    # Column 0 has full history, column 1 is too short for a 5y stock window
+    floors = engine.calculate_dynamic_floors(vol_mat, np.array([2000, 1000]), np.array([365, 252]))
+
+    expected = engine.calculate_dynamic_floor(pd.Series(vol_mat[:, 0]), 365)
+    assert floors[0] == pytest.approx(expected)
+    assert floors[1] == 0.50
+
+
+def test_compute_safe_prices_batched(mock_config):
+    """Batched safe prices apply the cap and propagate NaN volatility."""
+    engine = RiskEngine(mock_config)
+
+    result = engine.compute_safe_prices_batched(
+        np.array([0.2, 10.0, np.nan]), np.array([100.0, 100.0, 100.0])
+    )
+    prices = result["Half Kelly Price"]
+
+    assert prices[0] == pytest.approx(100.0 * (1 - 0.3))
+    assert prices[1] == pytest.approx(100.0 * (1 - 0.85))
+    assert np.isnan(prices[2])
+
+
+def test_dynamic_floor_matches_pandas_quantile(mock_config):
+    """The NumPy quantile must reproduce Series.quantile, including NaN skipping."""
+    engine = RiskEngine(mock_config)
+    rng = np.random.default_rng(3)
+    vol = pd.Series(rng.uniform(0.2, 1.0, 2000))
+    vol.iloc[-100:-90] = np.nan
+
+    floor = engine.calculate_dynamic_floor(vol, 365)
+
+    assert floor == pytest.approx(vol.tail(5 * 365).quantile(0.25))
+
+
+def test_dynamic_floors_batched_partition_matches_single(mock_config):
+    """Partition-based floors agree with the per-series path, NaN windows included."""
+    engine = RiskEngine(mock_config)
+    rng = np.random.default_rng(4)
+    vol_mat = rng.uniform(0.2, 1.0, size=(2000, 4))
+    vol_mat[1990, 2] = np.nan  # Forces the nanquantile fallback for column 2
+
+    annual_days = np.array([365, 252, 365, 252])
+    floors = engine.calculate_dynamic_floors(vol_mat, np.full(4, 2000), annual_days)
+
+    for j in range(4):
+        expected = engine.calculate_dynamic_floor(pd.Series(vol_mat[:, j]), annual_days[j])
+        assert floors[j] == pytest.approx(expected, rel=1e-12)
+
+
+def test_assess_current_risk_fused_matches_fallback(mock_config, mocker):
+    """The fused kernel and the composed NumPy path must agree."""
+    engine = RiskEngine(mock_config)
+    rng = np.random.default_rng(5)
+    close_mat = np.asfortranarray(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.03, size=(2000, 3)), axis=0))
+    )
+    close_mat[:1500, 2] = np.nan  # Short history -> fallback floor
+    lengths = np.array([2000, 2000, 500])
+    annual_days = np.array([365, 252, 252])
+    vol_mat = engine.calculate_volatility_batched(close_mat, annual_days)
+
+    highs = np.nanmax(close_mat[-365:], axis=0)
+
+    fused = engine.assess_current_risk(close_mat, vol_mat, lengths, annual_days, highs)
+    mocker.patch("src.risk_engine.HAS_NUMBA", False)
+    plain = engine.assess_current_risk(close_mat, vol_mat, lengths, annual_days, highs)
+
+    for a, b in zip(fused[:3], plain[:3]):
+        np.testing.assert_allclose(a, b, rtol=1e-6)
+    np.testing.assert_allclose(
+        fused[3]["Half Kelly Price"], plain[3]["Half Kelly Price"], rtol=1e-6
+    )
+    assert fused[0][2] == 0.50
+
+
+def test_annual_days_precomputed_per_asset(mock_config):
+    """Trading days are resolved once per configured asset, in config order."""
+    engine = RiskEngine(mock_config)
+
+    assert engine.annual_days.dtype == np.int32
+    assert list(engine.annual_days) == [365, 252]
+
+
+def test_price_extremes_fused_matches_fallback(mock_config, mocker):
+    """The single-scan kernel agrees with separate NumPy max/argmax reductions."""
+    mock_config.settings.update({"lookback_days": 50, "drift_lookback_days": 120})
+    engine = RiskEngine(mock_config)
+    rng = np.random.default_rng(6)
+    close_mat = np.asfortranarray(rng.uniform(50, 150, size=(200, 3)))
+    close_mat[:150, 1] = np.nan  # History shorter than the drift window
+    close_mat[190, 2] = close_mat[100, 2] = 1000.0  # Tie resolves to the earliest row
+
+    fused = engine.price_extremes(close_mat)
+    mocker.patch("src.risk_engine.HAS_NUMBA", False)
+    plain = engine.price_extremes(close_mat)
+
+    np.testing.assert_allclose(fused[0], plain[0])
+    np.testing.assert_array_equal(fused[1], plain[1])
+    assert fused[1][2] == 100